@@ -5,7 +5,8 @@ REPO_ROOT="$(cd "$(dirname "$0")" && pwd)"
 
 echo "=== Removing existing output files ==="
 rm -f "$REPO_ROOT/model_prices_and_context_window.json" \
-      "$REPO_ROOT/model_prices_and_context_window.sha256"
+      "$REPO_ROOT/model_prices_and_context_window.sha256" \
+      "$REPO_ROOT/model_prices_and_context_window.meta.json"
 
 echo "=== Running sync script ==="
 python3 "$REPO_ROOT/scripts/sync_prices.py" --config config.json --repo-root "$REPO_ROOT"
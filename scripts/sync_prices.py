@@ -7,15 +7,45 @@ Usage:
 """
 
 import argparse
-import copy
+from collections.abc import Callable, Iterable, Iterator
+import contextlib
 from decimal import Decimal
+import gzip
 import hashlib
+import io
 import json
 import logging
+import math
 import os
+import re
 import sys
 import urllib.error
 import urllib.request
+import zlib
+
+try:
+    import ahocorasick
+except ImportError:  # optional; fall back to a compiled regex
+    ahocorasick = None
+
+try:
+    import ijson
+
+    # Pinned to the C backend: the pure-Python one accepts integers the C one
+    # rejects, and output must not depend on which backend happens to load.
+    ijson_backend = ijson.get_backend("yajl2_c")
+except ImportError:  # optional; fall back to json.loads
+    ijson = ijson_backend = None
+
+try:
+    import orjson
+except ImportError:  # optional; fall back to json.loads
+    orjson = None
+
+try:
+    import urllib3
+except ImportError:  # optional; fall back to urllib.request
+    urllib3 = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +54,20 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
+def json_loads(raw: bytes):
+    """Decode JSON bytes, using orjson when installed.
+
+    Anything orjson rejects (NaN/Infinity, integers beyond 64 bits) is retried
+    with json, which accepts everything the json-based writers can produce.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
@@ -42,8 +86,8 @@ def load_config(path: str) -> dict:
     if not os.path.isfile(path):
         log.error("Config file not found: %s", path)
         sys.exit(1)
-    with open(path, "r", encoding="utf-8") as f:
-        cfg = json.load(f)
+    with open(path, "rb") as f:
+        cfg = json_loads(f.read())
     missing = [k for k in REQUIRED_CONFIG_KEYS if k not in cfg]
     if missing:
         log.error("Config missing required keys: %s", ", ".join(missing))
@@ -54,6 +98,19 @@ def load_config(path: str) -> dict:
     return cfg
 
 
+def compute_sync_fingerprint(config: dict) -> str:
+    """Return hex SHA-256 over the config (as canonical JSON) and this script's source.
+
+    Keys are sorted and whitespace stripped, so reformatting config.json
+    does not count as a change. Any edit to the sync logic itself does, so
+    it is never masked by an upstream 304.
+    """
+    hasher = hashlib.sha256(json.dumps(config, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    with open(__file__, "rb") as f:
+        hasher.update(f.read())
+    return hasher.hexdigest()
+
+
 # ---------------------------------------------------------------------------
 # Existing data
 # ---------------------------------------------------------------------------
@@ -64,8 +121,8 @@ def load_existing(path: str) -> dict:
     if not os.path.isfile(path):
         log.info("No existing output file; starting fresh.")
         return {}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return json_loads(f.read())
 
 
 def load_existing_hash(path: str) -> str:
@@ -76,100 +133,254 @@ def load_existing_hash(path: str) -> str:
         return f.read().strip()
 
 
+def load_meta(path: str) -> dict:
+    """Load sync metadata (output hash, sync fingerprint, upstream validators), or return {}."""
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "rb") as f:
+        try:
+            meta = json_loads(f.read())
+        except json.JSONDecodeError as exc:
+            log.warning("Ignoring invalid meta file %s: %s", path, exc)
+            return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def upstream_validators(meta: dict, old_hash: str, sync_fingerprint: str) -> dict:
+    """Return the stored ETag/Last-Modified if they still describe the current output.
+
+    The validators are only reused when the output on disk, the config and this
+    script are exactly the ones the previous sync produced them with; otherwise
+    a 304 could hide a config or code change, or a locally rebuilt output.
+    """
+    if not old_hash or meta.get("hash") != old_hash or meta.get("sync_fingerprint") != sync_fingerprint:
+        return {}
+    return {k: meta[k] for k in ("etag", "last_modified") if meta.get(k)}
+
+
 # ---------------------------------------------------------------------------
 # Upstream fetch
 # ---------------------------------------------------------------------------
 
 
-def fetch_upstream(url: str) -> dict:
-    """Download the full upstream pricing JSON."""
-    log.info("Fetching upstream: %s", url)
+HTTP_HEADERS = {"User-Agent": "model-price-repo/1.0", "Accept-Encoding": "gzip, deflate"}
+
+# Shared pool so repeated fetches reuse the TLS connection.
+_http = urllib3.PoolManager(headers=HTTP_HEADERS) if urllib3 else None
+
+FETCH_ERRORS = (urllib.error.URLError, OSError, EOFError, zlib.error) + (
+    (urllib3.exceptions.HTTPError,) if urllib3 else ()
+)
+
+PARSE_ERRORS = (ValueError,) + ((ijson.JSONError,) if ijson else ())
+
+# yajl (ijson's C backend) rejects NaN/Infinity, integers outside
+# [-(2**63 - 1), 2**63 - 1] and floats that overflow; loads_upstream applies the
+# same limits so both parse paths accept exactly the same documents.
+UPSTREAM_INT_MAX = 2**63 - 1
+
+
+def _parse_upstream_int(text: str) -> int:
+    value = int(text)
+    if abs(value) > UPSTREAM_INT_MAX:
+        raise ValueError(f"integer overflow: {text}")
+    return value
+
+
+def _parse_upstream_float(text: str) -> float:
+    value = float(text)
+    if math.isinf(value):
+        raise ValueError(f"numeric (floating point) overflow: {text}")
+    return value
+
+
+def _reject_upstream_constant(text: str):
+    raise ValueError(f"invalid JSON constant: {text}")
+
+
+def loads_upstream(raw: bytes):
+    """Decode the upstream JSON in one go, with the streaming parser's limits."""
+    return json.loads(
+        raw,
+        parse_int=_parse_upstream_int,
+        parse_float=_parse_upstream_float,
+        parse_constant=_reject_upstream_constant,
+    )
+
+
+@contextlib.contextmanager
+def _http_open(url: str, headers: dict) -> Iterator[tuple[int, dict, object]]:
+    """Open ``url`` and yield (status, response_headers, body).
+
+    ``body`` is a file-like object that yields the decompressed payload. Uses
+    the shared urllib3 pool when available, otherwise urllib.request (which
+    only asks for gzip, as it is decoded here as a stream).
+    """
+    headers = {**HTTP_HEADERS, **headers}
+    if _http is not None:
+        resp = _http.request("GET", url, headers=headers, timeout=60, preload_content=False)
+        try:
+            yield resp.status, resp.headers, resp
+        finally:
+            resp.release_conn()
+        return
+
+    headers["Accept-Encoding"] = "gzip"
+    req = urllib.request.Request(url, headers=headers)
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "model-price-repo/1.0"})
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            raw = resp.read()
-    except (urllib.error.URLError, OSError) as exc:
-        log.error("Failed to fetch upstream: %s", exc)
+        resp = urllib.request.urlopen(req, timeout=60)
+    except urllib.error.HTTPError as exc:
+        resp = exc
+    with resp:
+        body = resp
+        if resp.headers.get("Content-Encoding", "").lower() == "gzip":
+            body = gzip.GzipFile(fileobj=resp)
+        yield resp.status, resp.headers, body
+
+
+def _iter_models(body, stack: contextlib.ExitStack) -> Iterator[tuple[str, object]]:
+    """Yield the (key, value) pairs of the upstream top-level object.
+
+    Streams with ijson's C backend when installed, so only the entry being
+    yielded is held in memory. Closes ``stack`` (the HTTP response) once
+    exhausted.
+    """
+    count = 0
+    with stack:
+        try:
+            if ijson_backend is not None:
+                for item in ijson_backend.kvitems(body, "", use_float=True):
+                    count += 1
+                    yield item
+            else:
+                data = loads_upstream(body.read())
+                if not isinstance(data, dict):
+                    log.error("Upstream JSON is not an object (got %s)", type(data).__name__)
+                    sys.exit(1)
+                for item in data.items():
+                    count += 1
+                    yield item
+        except PARSE_ERRORS as exc:
+            log.error("Upstream JSON is invalid: %s", exc)
+            sys.exit(1)
+        except FETCH_ERRORS as exc:
+            log.error("Failed to fetch upstream: %s", exc)
+            sys.exit(1)
+
+    if not count:
+        log.error("Upstream JSON has no model entries (empty or not an object).")
         sys.exit(1)
+    log.info("Upstream contains %d model entries.", count)
 
+
+def fetch_upstream(url: str, validators: dict) -> tuple[Iterator[tuple[str, object]] | None, dict]:
+    """Request the upstream pricing JSON.
+
+    Sends If-None-Match / If-Modified-Since from ``validators`` when present.
+    Returns (models, new_validators); ``models`` lazily streams the upstream
+    (key, value) pairs and is None when upstream answered 304.
+    """
+    log.info("Fetching upstream: %s", url)
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    stack = contextlib.ExitStack()
     try:
-        data = json.loads(raw)
-    except json.JSONDecodeError as exc:
-        log.error("Upstream JSON is invalid: %s", exc)
+        status, resp_headers, body = stack.enter_context(_http_open(url, headers))
+    except FETCH_ERRORS as exc:
+        log.error("Failed to fetch upstream: %s", exc)
         sys.exit(1)
 
-    if not isinstance(data, dict):
-        log.error("Upstream JSON is not an object (got %s)", type(data).__name__)
+    if status != 200:
+        stack.close()
+        if status == 304:
+            log.info("Upstream not modified (HTTP 304).")
+            return None, validators
+        log.error("Failed to fetch upstream: HTTP %d", status)
         sys.exit(1)
-
-    log.info("Upstream contains %d model entries.", len(data))
-    return data
+    new_validators = {
+        key: resp_headers[header]
+        for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+        if resp_headers.get(header)
+    }
+    return _iter_models(body, stack), new_validators
 
 
 # ---------------------------------------------------------------------------
-# Filtering
+# Filter & merge
 # ---------------------------------------------------------------------------
 
 
-def filter_upstream(data: dict, config: dict) -> dict:
-    """Apply prefix_filters and exclude_patterns to upstream data."""
-    prefixes = tuple(config.get("prefix_filters", []))
-    excludes = config.get("exclude_patterns", [])
-
-    filtered = {}
-    for key, value in data.items():
-        # Exclude first
-        if any(pat in key for pat in excludes):
-            continue
-        # Then check prefix match
-        if prefixes and not key.startswith(prefixes):
-            continue
-        filtered[key] = value
+def build_exclude_matcher(excludes: list[str]) -> Callable[[str], object] | None:
+    """Return a predicate that is truthy when a key contains any exclude pattern.
 
-    log.info("Filtered to %d models (from %d upstream).", len(filtered), len(data))
-    return filtered
+    All patterns are matched in one scan per key: an Aho-Corasick automaton
+    when pyahocorasick is installed, otherwise a single alternation regex.
+    The automaton refuses some words (e.g. ""), so if any pattern is not added
+    the regex is used instead. Returns None when there are no patterns.
+    """
+    if not excludes:
+        return None
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        if all(automaton.add_word(pat, pat) for pat in set(excludes)):
+            automaton.make_automaton()
+            return lambda key: next(automaton.iter(key), None) is not None
+    return re.compile("|".join(map(re.escape, excludes))).search
 
 
-# ---------------------------------------------------------------------------
-# Merge
-# ---------------------------------------------------------------------------
+_MISSING = object()
 
 
-def merge_models(
+def filter_and_merge(
+    models: Iterable[tuple[str, object]],
     existing: dict,
-    filtered: dict,
+    config: dict,
     sync_mode: str,
     update_existing: bool,
 ) -> tuple[dict, dict]:
-    """Merge filtered upstream into existing data.
+    """Filter upstream (key, value) pairs and merge them into existing data.
 
-    Returns (merged_dict, stats_dict).
+    Applies exclude_patterns and prefix_filters to each upstream entry as it
+    arrives and merges kept entries straight into the result, so no separate
+    filtered dict is built. Returns (merged_dict, stats_dict).
     """
-    stats = {"added": 0, "updated": 0, "unchanged": 0, "total_upstream": len(filtered)}
-
-    if sync_mode == "full":
-        # Full mode: replace entirely with filtered upstream
-        stats["added"] = len(filtered)
-        return dict(filtered), stats
+    prefixes = tuple(config.get("prefix_filters", []))
+    is_excluded = build_exclude_matcher(config.get("exclude_patterns", []))
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "total_upstream": 0}
+
+    # Full mode: replace entirely with filtered upstream
+    full = sync_mode == "full"
+    merged = {} if full else dict(existing)
+    seen = 0
+    for key, value in models:
+        seen += 1
+        # Exclude first
+        if is_excluded is not None and is_excluded(key):
+            continue
+        # Then check prefix match
+        if prefixes and not key.startswith(prefixes):
+            continue
+        stats["total_upstream"] += 1
 
-    # Additive mode
-    merged = dict(existing)
-    for key, value in filtered.items():
-        if key not in merged:
+        current = merged.get(key, _MISSING)
+        if full or current is _MISSING:
             merged[key] = value
             stats["added"] += 1
         elif update_existing:
-            if merged[key] != value:
+            if current != value:
                 merged[key] = value
                 stats["updated"] += 1
             else:
                 stats["unchanged"] += 1
         else:
             # update_existing=False: preserve existing fields, but absorb new fields from upstream
-            if isinstance(merged[key], dict) and isinstance(value, dict):
-                new_fields = {k: v for k, v in value.items() if k not in merged[key]}
+            if isinstance(current, dict) and isinstance(value, dict):
+                new_fields = {k: v for k, v in value.items() if k not in current}
                 if new_fields:
-                    merged[key].update(new_fields)
+                    current.update(new_fields)
                     log.info("Model '%s': absorbed %d new field(s) from upstream: %s", key, len(new_fields), list(new_fields))
                     stats["updated"] += 1
                 else:
@@ -177,6 +388,7 @@ def merge_models(
             else:
                 stats["unchanged"] += 1
 
+    log.info("Filtered to %d models (from %d upstream).", stats["total_upstream"], seen)
     return merged, stats
 
 
@@ -186,7 +398,12 @@ def merge_models(
 
 
 def apply_aliases(data: dict, aliases: dict) -> dict:
-    """Deep-copy source model data into alias keys."""
+    """Point alias keys at their source model's data.
+
+    The entry object is shared, not copied. That is safe because every step
+    after this one replaces entries instead of mutating them in place.
+    """
+    applied = []
     for alias_key, alias_cfg in aliases.items():
         source = alias_cfg.get("source", "")
         if source not in data:
@@ -196,28 +413,49 @@ def apply_aliases(data: dict, aliases: dict) -> dict:
                 source,
             )
             continue
-        data[alias_key] = copy.deepcopy(data[source])
-        log.info("Alias '%s' -> '%s' applied.", alias_key, source)
+        data[alias_key] = data[source]
+        applied.append((alias_key, source))
+
+    log.info("Applied %d of %d alias(es).", len(applied), len(aliases))
+    if log.isEnabledFor(logging.DEBUG):
+        for alias_key, source in applied:
+            log.debug("Alias '%s' -> '%s' applied.", alias_key, source)
     return data
 
 
 def apply_custom_models(data: dict, custom: dict) -> dict:
-    """Inject custom model definitions (deep merge for existing, full set for new)."""
+    """Inject custom model definitions (field merge for existing, full set for new).
+
+    Custom fields override top-level fields of an existing entry; nested
+    objects are replaced as a whole, not merged. The merged entry is a new
+    dict, since the existing one may be shared with an alias.
+    """
+    merged = []
+    injected = []
     for key, value in custom.items():
-        if key in data and isinstance(data[key], dict) and isinstance(value, dict):
-            data[key].update(value)
-            log.info("Custom model '%s' merged (deep).", key)
+        if isinstance(value, dict) and isinstance(data.get(key), dict):
+            data[key] = data[key] | value
+            merged.append(key)
         else:
             data[key] = value
-            log.info("Custom model '%s' injected.", key)
+            injected.append(key)
+
+    log.info("Custom models: %d merged, %d injected.", len(merged), len(injected))
+    if log.isEnabledFor(logging.DEBUG):
+        for key in merged:
+            log.debug("Custom model '%s' merged.", key)
+        for key in injected:
+            log.debug("Custom model '%s' injected.", key)
     return data
 
 
 def fill_cache_1hr_pricing(data: dict, config: dict) -> int:
     """Auto-fill missing cache_creation_input_token_cost_above_1hr for matching models.
 
-    Uses a fixed ratio (default 1.6x) of the 5-minute cache write cost.
-    Returns the number of models auto-filled.
+    Uses a fixed ratio (default 1.6x) of the 5-minute cache write cost. The
+    product is computed in Decimal so published prices stay clean (3e-05, not
+    2.9999999999999997e-05); set ``exact_decimal: false`` to use plain float
+    math instead. Returns the number of models auto-filled.
     """
     auto_fill_cfg = config.get("cache_1hr_auto_fill")
     if not auto_fill_cfg:
@@ -225,7 +463,10 @@ def fill_cache_1hr_pricing(data: dict, config: dict) -> int:
 
     prefix = auto_fill_cfg.get("model_prefix", "claude-")
     ratio = auto_fill_cfg.get("ratio", 1.6)
-    count = 0
+    exact = auto_fill_cfg.get("exact_decimal", True)
+    ratio_dec = Decimal(str(ratio))
+    ratio_float = float(ratio)
+    filled = []
 
     for key, value in data.items():
         if not key.startswith(prefix):
@@ -237,13 +478,19 @@ def fill_cache_1hr_pricing(data: dict, config: dict) -> int:
             continue
         if value.get("cache_creation_input_token_cost_above_1hr") is not None:
             continue
-        value["cache_creation_input_token_cost_above_1hr"] = float(
-            Decimal(str(cost_5m)) * Decimal(str(ratio))
-        )
-        log.info("Auto-filled cache 1hr cost for '%s': %s * %s = %s", key, cost_5m, ratio, value["cache_creation_input_token_cost_above_1hr"])
-        count += 1
+        if exact:
+            cost_1h = float(Decimal(str(cost_5m)) * ratio_dec)
+        else:
+            cost_1h = float(cost_5m) * ratio_float
+        # Replace rather than mutate: the entry may be shared with an alias.
+        data[key] = {**value, "cache_creation_input_token_cost_above_1hr": cost_1h}
+        filled.append((key, cost_5m, cost_1h))
 
-    return count
+    log.info("Auto-filled cache 1hr cost for %d model(s).", len(filled))
+    if log.isEnabledFor(logging.DEBUG):
+        for key, cost_5m, cost_1h in filled:
+            log.debug("Auto-filled cache 1hr cost for '%s': %s * %s = %s", key, cost_5m, ratio, cost_1h)
+    return len(filled)
 
 
 # ---------------------------------------------------------------------------
@@ -251,33 +498,87 @@ def fill_cache_1hr_pricing(data: dict, config: dict) -> int:
 # ---------------------------------------------------------------------------
 
 
+def write_atomic(path: str, data: bytes) -> None:
+    """Write ``data`` to ``path`` via an fsync'd temp file and os.replace.
+
+    Readers (and a later run) see either the old file or the new one, never a
+    truncated one.
+    """
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    os.close(fd)
+    os.replace(tmp_path, path)
+
+
 def compute_hash(json_bytes: bytes) -> str:
     """Return hex SHA-256 of the given bytes."""
     return hashlib.sha256(json_bytes).hexdigest()
 
 
+# Encoded with json, not orjson: orjson formats floats differently
+# (1e-6 vs 1e-06), which would change the published bytes and hash.
+OUTPUT_ENCODER = json.JSONEncoder(sort_keys=True, indent=2)
+OUTPUT_BLOCK_SIZE = 64 * 1024
+
+
+def iter_output_blocks(data: dict) -> Iterator[bytes]:
+    """Yield the UTF-8 output JSON (with trailing newline) in ~64 KiB blocks."""
+    pending = []
+    size = 0
+    for chunk in OUTPUT_ENCODER.iterencode(data):
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= OUTPUT_BLOCK_SIZE:
+            yield "".join(pending).encode("utf-8")
+            pending.clear()
+            size = 0
+    pending.append("\n")
+    yield "".join(pending).encode("utf-8")
+
+
 def write_output(data: dict, json_path: str, hash_path: str, old_hash: str) -> tuple[bool, str]:
     """Write sorted JSON and SHA-256 hash file.
 
+    The hash is computed block by block while encoding, so the payload is
+    only buffered once and never written when it matches ``old_hash``.
     Returns (changed: bool, new_hash: str).
     """
-    json_bytes = (json.dumps(data, sort_keys=True, indent=2) + "\n").encode("utf-8")
-    new_hash = compute_hash(json_bytes)
+    hasher = hashlib.sha256()
+    buf = io.BytesIO()
+    for block in iter_output_blocks(data):
+        hasher.update(block)
+        buf.write(block)
+    new_hash = hasher.hexdigest()
 
     if new_hash == old_hash:
         log.info("No changes detected (hash matches).")
         return False, new_hash
 
-    with open(json_path, "wb") as f:
-        f.write(json_bytes)
-    with open(hash_path, "w", encoding="utf-8") as f:
-        f.write(new_hash + "\n")
+    write_atomic(json_path, buf.getbuffer())
+    write_atomic(hash_path, (new_hash + "\n").encode("utf-8"))
 
     log.info("Output written: %s (%d models)", json_path, len(data))
     log.info("Hash written:   %s", hash_path)
     return True, new_hash
 
 
+def write_meta(meta: dict, path: str) -> None:
+    """Write sync metadata as sorted JSON, skipping the write if nothing changed."""
+    if load_meta(path) == meta:
+        return
+    write_atomic(path, (json.dumps(meta, sort_keys=True, indent=2) + "\n").encode("utf-8"))
+    log.info("Meta written:   %s", path)
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -287,7 +588,10 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Sync model pricing from upstream.")
     parser.add_argument("--config", default="config.json", help="Path to config.json")
     parser.add_argument("--repo-root", default=".", help="Repository root directory")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log per-model alias/custom/cache details")
     args = parser.parse_args()
+    if args.verbose:
+        log.setLevel(logging.DEBUG)
 
     repo_root = os.path.abspath(args.repo_root)
     config_path = os.path.join(repo_root, args.config)
@@ -297,22 +601,33 @@ def main() -> None:
 
     output_path = os.path.join(repo_root, config["output_file"])
     hash_path = os.path.join(repo_root, config["hash_file"])
+    meta_file = config.get("meta_file") or os.path.splitext(config["hash_file"])[0] + ".meta.json"
+    meta_path = os.path.join(repo_root, meta_file)
+    sync_fingerprint = compute_sync_fingerprint(config)
 
-    # 2. Load existing data
-    existing = load_existing(output_path)
+    # 2. Fetch upstream (conditional on the validators of the last sync). When
+    #    upstream, config and this script are unchanged the output is too, so
+    #    stop before the existing output is even parsed.
     old_hash = load_existing_hash(hash_path)
+    validators = {}
+    if os.path.isfile(output_path):
+        validators = upstream_validators(load_meta(meta_path), old_hash, sync_fingerprint)
+    upstream, validators = fetch_upstream(config["upstream_url"], validators)
+    if upstream is None:
+        log.info("Upstream, config and sync script unchanged; output is up to date.")
+        print("CHANGED=false")
+        print(f"HASH={old_hash}")
+        return
+
+    # 3. Load existing data
+    existing = load_existing(output_path)
     log.info("Existing output has %d models.", len(existing))
 
-    # 3. Fetch upstream
-    upstream = fetch_upstream(config["upstream_url"])
-
-    # 4. Filter
-    filtered = filter_upstream(upstream, config)
-
-    # 5. Merge
-    merged, stats = merge_models(
+    # 4-5. Filter & merge (consumes the streamed upstream response)
+    merged, stats = filter_and_merge(
+        upstream,
         existing,
-        filtered,
+        config,
         config["sync_mode"],
         config.get("update_existing", False),
     )
@@ -338,6 +653,7 @@ def main() -> None:
 
     # 9. Write output
     changed, new_hash = write_output(merged, output_path, hash_path, old_hash)
+    write_meta({"hash": new_hash, "sync_fingerprint": sync_fingerprint, **validators}, meta_path)
 
     # 10. Report
     log.info("--- Sync Report ---")